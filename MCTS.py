@@ -2,14 +2,15 @@ import torch
 import numpy as np
 
 class MCTS:
-    def __init__(self, game, nnet, args):
+    def __init__(self, game, nnet, args, num_envs=1):
         self.game = game
         self.nnet = nnet
         self.args = args
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-        # Initialize tensors for parallel environments
-        self.num_envs = 1  # We'll always use a batch size of 1 for now
+        # Initialize tensors for parallel environments; leaves of all environments
+        # are evaluated together in a single nnet.predict call
+        self.num_envs = num_envs
         self.action_size = game.get_action_size()
 
         # Tree structure
@@ -32,8 +33,7 @@ class MCTS:
         for _ in range(self.args.num_mcts_sims):
             self.search(canonical_board)
 
-        s = torch.zeros(1, dtype=torch.long, device=self.device)
-        counts = self.Nsa[0, s]
+        counts = self.Nsa[:, 0]
 
         if temp == 0:
             best_actions = counts.argmax(dim=1)
@@ -55,6 +55,7 @@ class MCTS:
     def search(self, canonical_boards):
         # canonical_boards is already batched
         env_mask = torch.ones(self.num_envs, dtype=torch.bool, device=self.device)
+        envs = torch.arange(self.num_envs, device=self.device)
         s = torch.zeros(self.num_envs, dtype=torch.long, device=self.device)
         
         # Add a depth counter to limit recursion
@@ -62,30 +63,29 @@ class MCTS:
         max_depth = 1000  # Adjust this value as needed
         
         while env_mask.any() and depth < max_depth:
-            ended = self.Es[torch.arange(self.num_envs), s] != 0
+            ended = env_mask & (self.Es[envs, s] != 0)
             if ended.any():
                 env_mask[ended] = False
                 continue
 
-            unvisited = self.Ns[torch.arange(self.num_envs), s] == 0
-            if unvisited.any():
-                unvisited_mask = env_mask & unvisited
-                v = self._expand(canonical_boards[unvisited_mask], s[unvisited_mask])
-                self._backpropagate(s[unvisited_mask], torch.zeros_like(s[unvisited_mask]), v)
+            # Expand every environment that reached a leaf with one batched evaluation
+            unvisited_mask = env_mask & (self.Ns[envs, s] == 0)
+            if unvisited_mask.any():
+                v = self._expand(canonical_boards[unvisited_mask], s[unvisited_mask], envs[unvisited_mask])
+                self._backpropagate(s[unvisited_mask], torch.zeros_like(s[unvisited_mask]), v, envs[unvisited_mask])
                 env_mask[unvisited_mask] = False
                 continue
 
-            valid_moves = self.Vs[torch.arange(self.num_envs), s]
+            valid_moves = self.Vs[envs, s]
             uct_scores = self._uct_scores(s)
             uct_scores[~valid_moves] = float('-inf')
             a = uct_scores.argmax(dim=1)
 
             next_s, next_player = self.game.get_next_state(canonical_boards, 1, a)
-            next_player = torch.full((self.num_envs,), next_player, device=self.device)
             canonical_boards = self.game.get_canonical_form(next_s, next_player)
             
             # Instead of recursive call, update s and continue the loop
-            s = self.next_node[torch.arange(self.num_envs)]
+            s = self.next_node[envs]
             self.next_node += 1
             depth += 1
 
@@ -93,9 +93,12 @@ class MCTS:
         if depth == max_depth:
             print(f"Warning: Max depth {max_depth} reached in MCTS search")
 
-        return -self.Es[torch.arange(self.num_envs), s]
+        return -self.Es[envs, s]
+
+    def _expand(self, canonical_boards, s, envs=None):
+        if envs is None:
+            envs = torch.arange(len(s), device=self.device)
 
-    def _expand(self, canonical_boards, s):
         pi, v = self.nnet.predict(canonical_boards)
         valids = self.game.get_valid_moves(canonical_boards, 1)
         
@@ -112,12 +115,12 @@ class MCTS:
             pi = torch.nn.functional.pad(pi, (0, self.action_size - pi.shape[1]))
             valids = torch.nn.functional.pad(valids, (0, self.action_size - valids.shape[1]))
         
-        self.Ps[torch.arange(len(s)), s] = pi
-        self.Ps[torch.arange(len(s)), s] *= valids
-        sum_Ps_s = self.Ps[torch.arange(len(s)), s].sum(dim=1, keepdim=True)
-        self.Ps[torch.arange(len(s)), s] /= sum_Ps_s
-        self.Vs[torch.arange(len(s)), s] = valids.bool()  # Convert to boolean
-        self.Es[torch.arange(len(s)), s] = self.game.get_game_ended(canonical_boards, 1)
+        self.Ps[envs, s] = pi
+        self.Ps[envs, s] *= valids
+        sum_Ps_s = self.Ps[envs, s].sum(dim=1, keepdim=True)
+        self.Ps[envs, s] /= sum_Ps_s
+        self.Vs[envs, s] = valids.bool()  # Convert to boolean
+        self.Es[envs, s] = self.game.get_game_ended(canonical_boards, 1)
         v = torch.from_numpy(v).float().to(self.device) if isinstance(v, np.ndarray) else v
         v = v.squeeze(-1)
         return -v
@@ -131,8 +134,9 @@ class MCTS:
         uct = Qsa + self.args.cpuct * Psa * Ns_sqrt / (1 + Nsa)
         return uct
 
-    def _backpropagate(self, s, a, v):
-        env_indices = torch.arange(self.num_envs)
+    def _backpropagate(self, s, a, v, env_indices=None):
+        if env_indices is None:
+            env_indices = torch.arange(self.num_envs, device=self.device)
         self.Qsa[env_indices, s, a] = (self.Nsa[env_indices, s, a] * self.Qsa[env_indices, s, a] + v) / (self.Nsa[env_indices, s, a] + 1)
         self.Nsa[env_indices, s, a] += 1
         self.Ns[env_indices, s] += 1
\ No newline at end of file
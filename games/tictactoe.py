@@ -13,7 +13,7 @@ class TicTacToeGame:
         return (self.n, self.n)
 
     def get_action_size(self):
-        return self.n * self.n
+        return self.n * self.n + 1  # 1 for pass
 
     def get_next_state(self, board, player, action):
         if board.dim() == 2:  # Single board
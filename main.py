@@ -72,6 +72,7 @@ if __name__ == "__main__":
         'updateThreshold': 0.6,  # During arena playoff, new neural net will be accepted if threshold or more of games are won.
         'maxlenOfQueue': 200000,  # Number of game examples to train the neural networks.
         'numMCTSSims': 25,  # Number of games moves for MCTS to simulate.
+        'num_parallel_envs': 8,  # Number of self-play games whose MCTS leaves are evaluated in one batch.
         'arenaCompare': 40,  # Number of games to play during arena play to determine if new net will be accepted.
         'cpuct': 1,
         'checkpoint': './temp/',
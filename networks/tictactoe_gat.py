@@ -7,9 +7,31 @@ from torch.utils.data import DataLoader, TensorDataset, DistributedSampler
 from sklearn.model_selection import train_test_split
 from torch.optim.lr_scheduler import ReduceLROnPlateau
 from torch.amp import autocast, GradScaler
+from typing import Optional
 import numpy as np
 import os
 
+@torch.jit.script
+def _edge_attention(scores_source_lifted, scores_target_lifted, leak_slope: float):
+    # Scripted so the pointwise chain (add, leaky relu, shift, exp) fuses into fewer kernels
+    scores_per_edge = F.leaky_relu(scores_source_lifted + scores_target_lifted, leak_slope)
+    return (scores_per_edge - scores_per_edge.max()).exp()
+
+@torch.jit.script
+def _dense_edge_attention(scores_source, scores_target, self_loops, leak_slope: float):
+    # Dense counterpart of _edge_attention for fully connected graphs: [B, H, N] scores in,
+    # [B, H, N_target, N_source] attentions out, with the [N, N] self_loops mask applied before the softmax
+    scores = F.leaky_relu(scores_target.unsqueeze(-1) + scores_source.unsqueeze(-2), leak_slope)
+    return torch.softmax(scores.masked_fill(self_loops, float('-inf')), dim=-1)
+
+@torch.jit.script
+def _skip_bias(out_nodes_features, skip: Optional[torch.Tensor], bias: Optional[torch.Tensor]):
+    if skip is not None:
+        out_nodes_features = out_nodes_features + skip
+    if bias is not None:
+        out_nodes_features = out_nodes_features + bias
+    return out_nodes_features
+
 class GATLayer(nn.Module):
     def __init__(self, in_features, out_features, num_heads, concat=True, activation=nn.ELU(),
                  dropout_prob=0.6, add_skip_connection=True, bias=True):
@@ -21,9 +43,9 @@ class GATLayer(nn.Module):
         self.activation = activation
         self.add_skip_connection = add_skip_connection
         
-        self.linear_proj = nn.Linear(in_features, num_heads * out_features, bias=False)
-        self.scoring_fn_target = nn.Parameter(torch.Tensor(1, num_heads, out_features))
-        self.scoring_fn_source = nn.Parameter(torch.Tensor(1, num_heads, out_features))
+        # A single GEMM produces the projected features and both per-head attention scores,
+        # since (W x) . a is itself linear in x
+        self.fused_proj = nn.Linear(in_features, num_heads * (out_features + 2), bias=False)
         
         if bias and concat:
             self.bias = nn.Parameter(torch.Tensor(num_heads * out_features))
@@ -37,46 +59,72 @@ class GATLayer(nn.Module):
         else:
             self.register_parameter('skip_proj', None)
         
-        self.leakyReLU = nn.LeakyReLU(0.2)
+        self.leak_slope = 0.2
         self.softmax = nn.Softmax(dim=-1)
         self.dropout = nn.Dropout(dropout_prob)
+        # [N, N] self-loop mask for the dense path, rebuilt only when the graph size changes;
+        # non-persistent so it follows .to() without ending up in checkpoints
+        self.register_buffer('self_loops', torch.empty(0, 0, dtype=torch.bool), persistent=False)
         
         self.init_params()
 
     def init_params(self):
-        nn.init.xavier_uniform_(self.linear_proj.weight)
-        nn.init.xavier_uniform_(self.scoring_fn_source)
-        nn.init.xavier_uniform_(self.scoring_fn_target)
+        nn.init.xavier_uniform_(self.fused_proj.weight)
         if self.bias is not None:
             torch.nn.init.zeros_(self.bias)
 
-    def forward(self, x, edge_index):
+    def forward(self, x, edge_index=None, indptr=None, batch_size=None):
+        # Without an edge_index, x holds batch_size equally sized, fully connected graphs
 
         num_nodes = x.size(0)
 
         # Linear projection and regularization
         x = self.dropout(x)
-        x = self.linear_proj(x).view(num_nodes, self.num_heads, self.out_features)
+        h = self.fused_proj(x)
+        num_proj_features = self.num_heads * self.out_features
+        x = h[:, :num_proj_features].view(num_nodes, self.num_heads, self.out_features)
         x = self.dropout(x)
 
         # Edge attention calculation
-        scores_source = (x * self.scoring_fn_source).sum(dim=-1)
-        scores_target = (x * self.scoring_fn_target).sum(dim=-1)
-        scores_source_lifted, scores_target_lifted, x_lifted = self.lift(scores_source, scores_target, x, edge_index)
-        scores_per_edge = self.leakyReLU(scores_source_lifted + scores_target_lifted)
-        
-        attentions_per_edge = self.neighborhood_aware_softmax(scores_per_edge, edge_index[1], num_nodes)
-        attentions_per_edge = self.dropout(attentions_per_edge)
+        scores_source = h[:, num_proj_features:num_proj_features + self.num_heads]
+        scores_target = h[:, num_proj_features + self.num_heads:]
+        if edge_index is None:
+            if batch_size is None:
+                raise ValueError("batch_size is required when no edge_index is given")
+            out_nodes_features = self.dense_attention(x, scores_source, scores_target, batch_size)
+        else:
+            scores_source_lifted, scores_target_lifted, x_lifted = self.lift(scores_source, scores_target, x, edge_index)
+            exp_scores_per_edge = _edge_attention(scores_source_lifted, scores_target_lifted, self.leak_slope)
+            
+            attentions_per_edge = self.neighborhood_aware_softmax(exp_scores_per_edge, edge_index[1], num_nodes, indptr)
+            attentions_per_edge = self.dropout(attentions_per_edge)
 
-        # Neighborhood aggregation
-        x_lifted_weighted = x_lifted * attentions_per_edge
-        out_nodes_features = self.aggregate_neighbors(x_lifted_weighted, edge_index, num_nodes)
+            # Neighborhood aggregation
+            x_lifted_weighted = x_lifted * attentions_per_edge
+            out_nodes_features = self.aggregate_neighbors(x_lifted_weighted, edge_index, num_nodes, indptr)
 
         # Skip connection and bias
         out_nodes_features = self.skip_concat_bias(x, out_nodes_features)
 
         return out_nodes_features if self.activation is None else self.activation(out_nodes_features)
 
+    def dense_attention(self, x, scores_source, scores_target, batch_size):
+        # On a fully connected graph the edge list is every (target, source) pair but the
+        # self-loops, so attention is a masked [N, N] softmax per head followed by one batched
+        # matmul. GAT's LeakyReLU(a_s + a_t) scores are not a dot product, which is why this
+        # stays an explicit softmax instead of scaled_dot_product_attention.
+        num_nodes = x.size(0) // batch_size
+        x = x.view(batch_size, num_nodes, self.num_heads, self.out_features).transpose(1, 2)
+        scores_source = scores_source.view(batch_size, num_nodes, self.num_heads).transpose(1, 2)
+        scores_target = scores_target.view(batch_size, num_nodes, self.num_heads).transpose(1, 2)
+
+        if self.self_loops.size(0) != num_nodes:
+            self.self_loops = torch.eye(num_nodes, dtype=torch.bool, device=x.device)
+        attentions = self.dropout(_dense_edge_attention(scores_source, scores_target, self.self_loops, self.leak_slope))
+
+        out_nodes_features = torch.matmul(attentions, x)
+        return out_nodes_features.transpose(1, 2).reshape(batch_size * num_nodes, self.num_heads, self.out_features)
+
     def lift(self, scores_source, scores_target, x, edge_index):
         src_nodes_index = edge_index[0]
         trg_nodes_index = edge_index[1]
@@ -85,50 +133,42 @@ class GATLayer(nn.Module):
         x_lifted = x.index_select(0, src_nodes_index)
         return scores_source, scores_target, x_lifted
 
-    def neighborhood_aware_softmax(self, scores_per_edge, trg_index, num_of_nodes):
-        scores_per_edge = scores_per_edge - scores_per_edge.max()
-        exp_scores_per_edge = scores_per_edge.exp()
-        neigborhood_aware_denominator = self.sum_edge_scores_neighborhood_aware(exp_scores_per_edge, trg_index, num_of_nodes)
+    def neighborhood_aware_softmax(self, exp_scores_per_edge, trg_index, num_of_nodes, indptr=None):
+        neighborhood_sums = self.sum_per_target(exp_scores_per_edge, trg_index, num_of_nodes, indptr)
+        neigborhood_aware_denominator = neighborhood_sums.index_select(0, trg_index)
+
         attentions_per_edge = exp_scores_per_edge / (neigborhood_aware_denominator + 1e-16)
         return attentions_per_edge.unsqueeze(-1)
 
-    def sum_edge_scores_neighborhood_aware(self, exp_scores_per_edge, trg_index, num_of_nodes):
-        trg_index_broadcasted = self.explicit_broadcast(trg_index, exp_scores_per_edge)
-        size = list(exp_scores_per_edge.shape)
-        size[0] = num_of_nodes
-        neighborhood_sums = torch.zeros(size, dtype=exp_scores_per_edge.dtype, device=exp_scores_per_edge.device)
-        neighborhood_sums.scatter_add_(0, trg_index_broadcasted, exp_scores_per_edge)
-        return neighborhood_sums.index_select(0, trg_index)
-
-    def aggregate_neighbors(self, x_lifted_weighted, edge_index, num_of_nodes):
-        trg_index_broadcasted = self.explicit_broadcast(edge_index[1], x_lifted_weighted)
-        size = list(x_lifted_weighted.shape)
-        size[0] = num_of_nodes
-        out_nodes_features = torch.zeros(size, dtype=x_lifted_weighted.dtype, device=x_lifted_weighted.device)
-        out_nodes_features.scatter_add_(0, trg_index_broadcasted, x_lifted_weighted)
-        return out_nodes_features
+    def aggregate_neighbors(self, x_lifted_weighted, edge_index, num_of_nodes, indptr=None):
+        return self.sum_per_target(x_lifted_weighted, edge_index[1], num_of_nodes, indptr)
+
+    def sum_per_target(self, values_per_edge, trg_index, num_of_nodes, indptr=None):
+        if indptr is not None:
+            # Edges are sorted by target, so each node's incoming edges form a contiguous
+            # segment and the sum needs no atomics; indptr is built by the caller, skip validation
+            return torch.segment_reduce(values_per_edge, 'sum', offsets=indptr, axis=0, unsafe=True)
+
+        # index_add_ scatters along dim 0 with a 1D index, so no broadcasted index is materialized
+        size = (num_of_nodes,) + values_per_edge.shape[1:]
+        return values_per_edge.new_zeros(size).index_add_(0, trg_index, values_per_edge)
 
     def skip_concat_bias(self, x, out_nodes_features):
+        skip = None
         if self.add_skip_connection:
             if out_nodes_features.shape[-1] == x.shape[-1]:
-                out_nodes_features += x.view(*out_nodes_features.shape)
+                skip = x.view(*out_nodes_features.shape)
             else:
-                out_nodes_features += self.skip_proj(x).view(*out_nodes_features.shape)
+                skip = self.skip_proj(x).view(*out_nodes_features.shape)
 
         if self.concat:
             out_nodes_features = out_nodes_features.view(-1, self.num_heads * self.out_features)
+            skip = skip.view(-1, self.num_heads * self.out_features) if skip is not None else None
         else:
             out_nodes_features = out_nodes_features.mean(dim=-2)
+            skip = skip.mean(dim=-2) if skip is not None else None
 
-        if self.bias is not None:
-            out_nodes_features += self.bias
-
-        return out_nodes_features
-
-    def explicit_broadcast(self, this, other):
-        for _ in range(this.dim(), other.dim()):
-            this = this.unsqueeze(-1)
-        return this.expand_as(other)
+        return _skip_bias(out_nodes_features, skip, self.bias)
 
 class TicTacToeGAT(nn.Module):
     def __init__(self, game, args):
@@ -143,60 +183,54 @@ class TicTacToeGAT(nn.Module):
         self.gat1 = GATLayer(self.num_features, args.num_channels, num_heads=args.num_heads, dropout_prob=args.dropout_rate)
         self.gat2 = GATLayer(args.num_channels * args.num_heads, args.num_channels, num_heads=args.num_heads, dropout_prob=args.dropout_rate)
         
-        self.fc1 = nn.Linear(args.num_channels * args.num_heads * self.num_nodes, 256)
-        self.fc2 = nn.Linear(256, 128)
-        
-        self.fc_policy = nn.Linear(128, self.action_size)
-        self.fc_value = nn.Linear(128, 1)
+        # Per-node heads: a shared node MLP feeds one policy logit per cell, while the
+        # value (and pass logit, for games that have one) read the whole board
+        self.node_mlp = nn.Linear(args.num_channels * args.num_heads, 64)
+        self.policy_head = nn.Linear(64, 1)
+        self.value_head = nn.Linear(64 * self.num_nodes, 1)
+        if self.action_size > self.num_nodes:
+            self.pass_head = nn.Linear(64 * self.num_nodes, self.action_size - self.num_nodes)
+        else:
+            self.register_parameter('pass_head', None)
 
     def forward(self, s):
-        x, edge_index = self._board_to_graph(s)
+        x = self._board_to_graph(s)
+        batch_size = x.size(0) // self.num_nodes
         
-        # GAT layers
-        x = self.gat1(x, edge_index)
+        # GAT layers; the board graph is fully connected, so they take the dense path
+        x = self.gat1(x, batch_size=batch_size)
         x = F.elu(x)
-        x = self.gat2(x, edge_index)
+        x = self.gat2(x, batch_size=batch_size)
         x = F.elu(x)
         
-        # Reshape x to (batch_size, nodes * features)
-        batch_size = s.size(0)
-        x = x.view(batch_size, -1)
-        
-        # FC layers
-        x = F.relu(self.fc1(x))
-        x = F.relu(self.fc2(x))
-        
-        pi = self.fc_policy(x)
-        v = self.fc_value(x)
+        # Reshape x to (batch_size, nodes, features)
+        x = x.view(batch_size, self.num_nodes, -1)
         
+        # Node-wise heads
+        h = F.relu(self.node_mlp(x))
+        pi = self.policy_head(h).squeeze(-1)
+        h = h.view(batch_size, -1)
+        if self.pass_head is not None:
+            pi = torch.cat([pi, self.pass_head(h)], dim=1)
+        v = self.value_head(h)
         
         return F.log_softmax(pi, dim=1), torch.tanh(v)
 
     def _board_to_graph(self, s):
-        # Ensure s is a 4D tensor (batch_size, 3, 3, 3)
-        if s.dim() == 3:
-            s = s.unsqueeze(0)
-        
+        # Expects (batch_size, 3, 3, 3) planes or raw boards (batch_size, 1, 3, 3); the wrapper
+        # adds the batch and channel dims, since only it knows whether a 3D input is a batch
         batch_size, channels, height, width = s.shape
-        assert channels == 3 and height == 3 and width == 3, "Input should be (batch_size, 3, 3, 3)"
-        
-        # Reshape s to (batch_size * num_nodes, 3)
-        x = s.view(batch_size * self.num_nodes, 3)
+        assert channels in (1, 3) and height == 3 and width == 3, "Input should be (batch_size, 3, 3, 3) or (batch_size, 1, 3, 3)"
         
-        # Create fully connected edge index for a single graph
-        edge_index_single = []
-        for i in range(self.num_nodes):
-            for j in range(self.num_nodes):
-                if i != j:
-                    edge_index_single.append([i, j])
-        edge_index_single = torch.tensor(edge_index_single, device=s.device).t()
-        
-        # Repeat the edge index for each graph in the batch
-        edge_index = edge_index_single.repeat(1, batch_size)
-        batch_offset = torch.arange(batch_size, device=s.device).repeat_interleave(edge_index_single.size(1)) * self.num_nodes
-        edge_index = edge_index + batch_offset
+        if channels == 1:
+            # Raw boards hold {-1, 0, 1}; remainder maps 0 -> 0, 1 -> 1, -1 -> 2, matching the
+            # empty/X/O channel layout, and a single one_hot call builds the node features
+            x = F.one_hot(s.reshape(-1).long().remainder(3), num_classes=self.num_features).to(s.dtype)
+        else:
+            # Move channels last so each row of (batch_size * num_nodes, 3) is one cell's features
+            x = s.permute(0, 2, 3, 1).reshape(batch_size * self.num_nodes, 3)
         
-        return x, edge_index
+        return x
 
 class NNetWrapper:
     def __init__(self, game, args):
@@ -209,45 +243,94 @@ class NNetWrapper:
 
         self.nnet = TicTacToeGAT(game, args).to(self.device)
 
+        if not args.distributed and getattr(args, 'world_size', 1) > 1:
+            raise ValueError("world_size > 1 requires distributed training; run main.py with --distributed")
+
         if args.distributed:
             self.nnet = DDP(self.nnet, device_ids=[args.local_rank], output_device=args.local_rank)
-        elif torch.cuda.device_count() > 1:
-            self.nnet = nn.DataParallel(self.nnet)
+
+        # MCTS evaluates a handful of boards at a time, so Python overhead dominates predict;
+        # CUDA graphs remove most of it. Only predict goes through the compiled handle: it always
+        # runs in eval mode without grad, and pads batches to powers of two, so it needs a few
+        # static graphs. Training and validation stay eager. Not enabled under DDP until validated.
+        self._compiled_predict = not args.distributed and self.device.type == 'cuda'
+        if self._compiled_predict:
+            self.predict_nnet = torch.compile(self.nnet, mode='reduce-overhead', dynamic=False)
+        else:
+            self.predict_nnet = self.nnet
 
         self.optimizer = optim.Adam(self.nnet.parameters(), lr=args.lr, weight_decay=args.l2_regularization)
         self.scheduler = ReduceLROnPlateau(self.optimizer, 'min', patience=5, factor=0.5)
-        self.scaler = GradScaler()
+        # Mixed precision only pays off on GPU; on CPU autocast and the scaler are pure overhead.
+        # bf16 keeps fp32's exponent range, so it needs no loss scaling; fall back to
+        # scaled fp16 only on GPUs without bf16 support
+        self._use_amp = self.device.type == 'cuda'
+        if self.device.type == 'cuda' and not torch.cuda.is_bf16_supported():
+            self.amp_dtype = torch.float16
+        else:
+            self.amp_dtype = torch.bfloat16
+        self.scaler = GradScaler(enabled=self._use_amp and self.amp_dtype == torch.float16)
         self.criterion_pi = nn.CrossEntropyLoss()
         self.criterion_v = nn.MSELoss()
 
+        # Page-locked staging buffers for predict's host-to-device copy, keyed by input shape
+        self._predict_pinned = {}
+
+        self.warmup()
+
+    def warmup(self, num_iters=2):
+        # The scripted attention helpers and the compiled predict graph are specialized on
+        # their first calls, so pay that cost here rather than on the first MCTS evaluation
+        dummy = np.zeros((1, self.board_x, self.board_y), dtype=np.float32)
+        for _ in range(num_iters):
+            self.predict(dummy)
+
+    def _board_tensor(self, boards, batched):
+        # Boards come in raw (n, n) from the game or as (C, n, n) planes; a 3D input is a batch
+        # of raw boards when batched and one board's planes otherwise. Always return (B, C, n, n)
+        boards = torch.as_tensor(boards, dtype=torch.float32)
+        if not batched:
+            boards = boards.unsqueeze(0)
+        if boards.dim() == 3:
+            boards = boards.unsqueeze(1)
+        return boards
+
     def train(self, examples):
         train_examples, val_examples = train_test_split(examples, test_size=0.2)
 
+        # Stack once in NumPy and hand the buffers to torch without a per-element copy
         train_data = TensorDataset(
-            torch.FloatTensor([ex[0] for ex in train_examples]),
-            torch.FloatTensor([ex[1] for ex in train_examples]),
-            torch.FloatTensor([ex[2] for ex in train_examples])
+            self._board_tensor(np.stack([ex[0] for ex in train_examples]), batched=True),
+            torch.from_numpy(np.stack([ex[1] for ex in train_examples]).astype(np.float32, copy=False)),
+            torch.from_numpy(np.asarray([ex[2] for ex in train_examples], dtype=np.float32))
         )
         
-        train_loader = DataLoader(train_data, batch_size=self.args.batch_size, shuffle=True)
+        pin_memory = self.device.type == 'cuda'
+        train_loader = DataLoader(train_data, batch_size=self.args.batch_size, shuffle=True, pin_memory=pin_memory)
 
         for epoch in range(self.args.epochs):
             self.nnet.train()
             total_loss = 0
             for batch_idx, (boards, target_pis, target_vs) in enumerate(train_loader):
-                boards, target_pis, target_vs = boards.to(self.device), target_pis.to(self.device), target_vs.to(self.device)
+                boards = boards.to(self.device, non_blocking=pin_memory)
+                target_pis = target_pis.to(self.device, non_blocking=pin_memory)
+                target_vs = target_vs.to(self.device, non_blocking=pin_memory)
                 
                 self.optimizer.zero_grad()
                 
-                with autocast(device_type=self.device.type):
+                with autocast(device_type=self.device.type, dtype=self.amp_dtype, enabled=self._use_amp):
                     out_pi, out_v = self.nnet(boards)
                     l_pi = self.criterion_pi(out_pi, target_pis)
                     l_v = self.criterion_v(out_v.squeeze(-1), target_vs)
                     loss = l_pi + l_v
 
-                self.scaler.scale(loss).backward()
-                self.scaler.step(self.optimizer)
-                self.scaler.update()
+                if self.scaler.is_enabled():
+                    self.scaler.scale(loss).backward()
+                    self.scaler.step(self.optimizer)
+                    self.scaler.update()
+                else:
+                    loss.backward()
+                    self.optimizer.step()
 
                 total_loss += loss.item()
 
@@ -260,28 +343,50 @@ class NNetWrapper:
         val_loss = 0
         with torch.no_grad():
             for board, target_pi, target_v in val_examples:
-                board = torch.FloatTensor(board.astype(np.float64)).unsqueeze(0).to(self.device)
+                board = self._board_tensor(board, batched=False).to(self.device)
                 target_pi = torch.FloatTensor(target_pi).unsqueeze(0).to(self.device)
                 target_v = torch.FloatTensor([target_v]).to(self.device)
                 
-                out_pi, out_v = self.nnet(board)
-                l_pi = self.criterion_pi(out_pi, target_pi)
-                l_v = self.criterion_v(out_v.squeeze(-1), target_v)
+                with autocast(device_type=self.device.type, dtype=self.amp_dtype, enabled=self._use_amp):
+                    out_pi, out_v = self.nnet(board)
+                    l_pi = self.criterion_pi(out_pi, target_pi)
+                    l_v = self.criterion_v(out_v.squeeze(-1), target_v)
                 val_loss += (l_pi + l_v).item()
 
         return val_loss / len(val_examples)
 
     def predict(self, board):
-        board = torch.FloatTensor(board.astype(np.float64))
-        if board.dim() == 3:
-            board = board.unsqueeze(0)
-        board = board.to(self.device)
+        # Takes NumPy arrays or tensors (MCTS passes its boards as tensors). A single raw (n, n)
+        # board gives (action_size,) and a float; (B, n, n) raw boards and (B, C, n, n) planes
+        # are batches and give (B, action_size) and (B,)
+        batched = board.ndim != 2
+        board = self._board_tensor(board, batched=batched)
+
+        num_boards = board.shape[0]
+        if self._compiled_predict:
+            # Pad to the next power of two so the compiled graph only sees a few batch sizes
+            padded_size = 1 << (num_boards - 1).bit_length()
+            if padded_size != num_boards:
+                board = torch.cat([board, board.new_zeros((padded_size - num_boards,) + board.shape[1:])])
+
+        if board.device.type != self.device.type:
+            # Stage through a reused pinned buffer so the copy to the GPU can run asynchronously
+            pinned = self._predict_pinned.get(board.shape)
+            if pinned is None:
+                pinned = torch.empty(board.shape, dtype=torch.float32, pin_memory=True)
+                self._predict_pinned[board.shape] = pinned
+            pinned.copy_(board)
+            board = pinned.to(self.device, non_blocking=True)
         
         self.nnet.eval()
-        with torch.no_grad():
-            pi, v = self.nnet(board)
-
-        return pi.exp().cpu().numpy()[0], v.cpu().numpy()[0].item() 
+        with torch.no_grad(), autocast(device_type=self.device.type, dtype=self.amp_dtype, enabled=self._use_amp):
+            pi, v = self.predict_nnet(board)
+        # Drop the padding rows before leaving the device
+        pi = pi[:num_boards].float().exp().cpu().numpy()
+        v = v[:num_boards].float().view(-1).cpu().numpy()
+        if not batched:
+            return pi[0], v[0].item()
+        return pi, v
 
 
     def save_checkpoint(self, folder='checkpoint', filename='checkpoint.pth.tar'):
@@ -307,20 +412,36 @@ class NNetWrapper:
         self.nnet.load_state_dict(checkpoint['state_dict'])
         self.optimizer.load_state_dict(checkpoint['optimizer'])
         self.scheduler.load_state_dict(checkpoint['scheduler'])
-        self.scaler.load_state_dict(checkpoint['scaler'])
+        # A disabled scaler (CPU or bf16) saves an empty state, which an enabled one rejects
+        if checkpoint['scaler'] and self.scaler.is_enabled():
+            self.scaler.load_state_dict(checkpoint['scaler'])
 
     def augment_examples(self, examples):
+        if not examples:
+            return []
+
+        # Transform the whole batch at once over the last two (spatial) axes, so raw (n, n) and
+        # (channels, n, n) boards both rotate and flip by row and column
+        boards = np.stack([board for board, _, _ in examples])
+        pis = np.stack([pi for _, pi, _ in examples])
+        vs = [v for _, _, v in examples]
+
+        # Only the board cells move; the trailing pass probability is carried over as is
+        num_cells = self.board_x * self.board_y
+        pis_grid = pis[:, :num_cells].reshape(len(examples), self.board_x, self.board_y)
+        pis_pass = pis[:, num_cells:]
+
+        def with_pass(grid):
+            return np.concatenate([grid.reshape(len(examples), -1), pis_pass], axis=1)
+
+        variants = [(boards, pis)]
+        for k in range(1, 4):
+            variants.append((np.rot90(boards, k, axes=(-2, -1)), with_pass(np.rot90(pis_grid, k, axes=(-2, -1)))))
+        variants.append((np.flip(boards, axis=-1), with_pass(np.flip(pis_grid, axis=-1))))
+
         augmented = []
-        for board, pi, v in examples:
-            augmented.append((board, pi, v))
-            
-            for k in range(1, 4):
-                rotated_board = np.rot90(board, k)
-                rotated_pi = np.rot90(pi.reshape(3, 3), k).flatten()
-                augmented.append((rotated_board, rotated_pi, v))
-            
-            flipped_board = np.fliplr(board)
-            flipped_pi = np.fliplr(pi.reshape(3, 3)).flatten()
-            augmented.append((flipped_board, flipped_pi, v))
+        for i, v in enumerate(vs):
+            for variant_boards, variant_pis in variants:
+                augmented.append((variant_boards[i], variant_pis[i], v))
             
-        return augmented
\ No newline at end of file
+        return augmented
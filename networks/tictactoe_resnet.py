@@ -234,14 +234,16 @@ class NNetWrapper:
 
     def get_symmetries(self, board, pi, v):
         symmetries = []
+        # Only the board cells move; a trailing pass probability is carried over as is
+        pi_board, pi_pass = pi[:9], pi[9:]
         for i in range(4):
             for flip in [False, True]:
                 new_b = np.rot90(board, i)
-                new_pi = np.rot90(pi.reshape(3, 3), i)
+                new_pi = np.rot90(pi_board.reshape(3, 3), i)
                 if flip:
                     new_b = np.fliplr(new_b)
                     new_pi = np.fliplr(new_pi)
-                symmetries.append((new_b, new_pi.flatten(), v))
+                symmetries.append((new_b, np.concatenate([new_pi.flatten(), pi_pass]), v))
         return symmetries
 
     def examples_to_tensors(self, examples):
@@ -41,32 +41,45 @@ class SelfPlay():
         self.skipFirstSelfPlay = False
 
     def executeEpisode(self):
-        trainExamples = []
-        board = self.game.get_init_board()
-        self.curPlayer = 1
+        return self.executeEpisodes(1)[0]
+
+    def executeEpisodes(self, num_envs):
+        # Play num_envs games in lockstep so that MCTS batches their leaf evaluations
+        self.mcts = MCTS(self.game, self.nnet, self.args, num_envs=num_envs)
+        trainExamples = [[] for _ in range(num_envs)]
+        results = [None] * num_envs
+        boards = [self.game.get_init_board() for _ in range(num_envs)]
+        curPlayers = [1] * num_envs
         episodeStep = 0
 
-        while True:
+        while any(r is None for r in results):
             episodeStep += 1
-            canonicalBoard = self.game.get_canonical_form(board, self.curPlayer)
+            canonicalBoards = torch.stack([self.game.get_canonical_form(b, p) for b, p in zip(boards, curPlayers)])
             temp = int(episodeStep < self.args.tempThreshold)
 
-            # Ensure canonicalBoard is batched
-            canonicalBoard = canonicalBoard.unsqueeze(0)
+            pis = self.mcts.get_action_prob(canonicalBoards, temp=temp).view(num_envs, -1)
+            # Sample on the host with one transfer for the whole batch instead of a torch.multinomial per game
+            pis_cdf = np.cumsum(pis.cpu().numpy(), axis=1)
 
-            pi = self.mcts.get_action_prob(canonicalBoard, temp=temp)
-            
-            sym = self.game.get_symmetries(canonicalBoard.squeeze(0), pi)
-            for b, p in sym:
-                trainExamples.append([b, self.curPlayer, p, None])
+            for i in range(num_envs):
+                # Finished games keep their final board so the batch shape stays fixed
+                if results[i] is not None:
+                    continue
+
+                pi = pis[i]
+                sym = self.game.get_symmetries(canonicalBoards[i], pi)
+                for b, p in sym:
+                    trainExamples[i].append([b, curPlayers[i], p, None])
 
-            action = torch.multinomial(torch.from_numpy(pi), 1).item()
-            board, self.curPlayer = self.game.get_next_state(board, self.curPlayer, action)
+                action = min(int(np.searchsorted(pis_cdf[i], np.random.random(), side='right')), len(pis_cdf[i]) - 1)
+                boards[i], curPlayers[i] = self.game.get_next_state(boards[i], curPlayers[i], action)
 
-            r = self.game.get_game_ended(board, self.curPlayer)
+                r = self.game.get_game_ended(boards[i], curPlayers[i])
 
-            if r != 0:
-                return [(x[0], x[2], r * ((-1) ** (x[1] != self.curPlayer))) for x in trainExamples]
+                if r != 0:
+                    results[i] = [(x[0], x[2], r * ((-1) ** (x[1] != curPlayers[i]))) for x in trainExamples[i]]
+
+        return results
 
     def learn(self):
         for i in range(1, self.args.numIters + 1):
@@ -77,17 +90,21 @@ class SelfPlay():
                 iterationTrainExamples = deque([], maxlen=self.args.maxlenOfQueue)
 
                 episode_num = self.args.numEps // self.world_size
-                for _ in tqdm(range(episode_num), desc="Self Play", disable=self.rank != 0):
-                    self.mcts = MCTS(self.game, self.nnet, self.args)
-                    iterationTrainExamples += self.executeEpisode()
+                episodes_done = 0
+                with tqdm(total=episode_num, desc="Self Play", disable=self.rank != 0) as pbar:
+                    while episodes_done < episode_num:
+                        num_envs = min(self.args.get('num_parallel_envs', 1), episode_num - episodes_done)
+                        for episode in self.executeEpisodes(num_envs):
+                            iterationTrainExamples += episode
+                        episodes_done += num_envs
+                        pbar.update(num_envs)
 
                 # Gather examples from all processes
                 if self.args.distributed:
-                    all_examples = [None for _ in range(self.world_size)]
-                    dist.all_gather_object(all_examples, iterationTrainExamples)
+                    all_examples = self.allGatherExamples(iterationTrainExamples)
                     
                     if self.rank == 0:
-                        iterationTrainExamples = deque(sum(all_examples, []), maxlen=self.args.maxlenOfQueue)
+                        iterationTrainExamples = deque(all_examples, maxlen=self.args.maxlenOfQueue)
                 
                 if self.rank == 0:
                     self.trainExamplesHistory.append(iterationTrainExamples)
@@ -107,22 +124,23 @@ class SelfPlay():
 
             # Broadcast trainExamples to all processes
             if self.args.distributed:
-                if self.rank == 0:
-                    examples_tensor = torch.tensor(trainExamples, dtype=torch.float32)
-                else:
-                    examples_tensor = torch.empty((0,), dtype=torch.float32)
+                examples_tensor = self.packExamples(trainExamples) if self.rank == 0 else None
                 
-                # Broadcast the size first
-                size_tensor = torch.tensor([examples_tensor.shape[0]], dtype=torch.long)
-                dist.broadcast(size_tensor, src=0)
+                # Broadcast the shape first
+                shape_tensor = torch.zeros(2, dtype=torch.long, device=self.device)
+                if self.rank == 0:
+                    shape_tensor.copy_(torch.tensor(examples_tensor.shape))
+                dist.broadcast(shape_tensor, src=0)
                 
-                if self.rank != 0:
-                    examples_tensor = torch.empty(size_tensor[0].item(), dtype=torch.float32)
+                if self.rank == 0:
+                    examples_tensor = examples_tensor.to(self.device)
+                else:
+                    examples_tensor = torch.empty(tuple(shape_tensor.tolist()), dtype=torch.float32, device=self.device)
                 
                 # Then broadcast the data
                 dist.broadcast(examples_tensor, src=0)
                 
-                trainExamples = examples_tensor.tolist()
+                trainExamples = self.unpackExamples(examples_tensor)
 
             # training new network, keeping a copy of the old one
             self.nnet.save_checkpoint(folder=self.args.checkpoint, filename='temp.pth.tar')
@@ -152,6 +170,61 @@ class SelfPlay():
             if self.args.distributed:
                 dist.barrier()
 
+    def packExamples(self, examples):
+        # One float32 row per example: flattened board, policy, then value
+        if len(examples) == 0:
+            return torch.zeros((0, 0), dtype=torch.float32)
+        boards, pis, vs = zip(*examples)
+        return torch.cat([
+            self.stackExampleField(boards).flatten(1),
+            self.stackExampleField(pis).flatten(1),
+            torch.tensor([float(v) for v in vs], dtype=torch.float32).unsqueeze(1),
+        ], dim=1)
+
+    def stackExampleField(self, values):
+        if isinstance(values[0], torch.Tensor):
+            return torch.stack(values).to(device='cpu', dtype=torch.float32)
+        return torch.from_numpy(np.stack(values).astype(np.float32, copy=False))
+
+    def unpackExamples(self, examples_tensor):
+        # Rows are [board, pi (action_size), v]; recover the board shape from what is left,
+        # so both raw (n, n) boards and (channels, n, n) boards round-trip. An empty pack has
+        # width 0 and no board shape to recover
+        if examples_tensor.shape[0] == 0:
+            return []
+
+        board_x, board_y = self.game.get_board_size()
+        board_size = examples_tensor.shape[1] - self.game.get_action_size() - 1
+        if board_size == board_x * board_y:
+            board_shape = (board_x, board_y)
+        elif board_size > 0 and board_size % (board_x * board_y) == 0:
+            board_shape = (board_size // (board_x * board_y), board_x, board_y)
+        else:
+            raise ValueError(f"Cannot unpack examples of width {examples_tensor.shape[1]} into boards of size {board_x}x{board_y}")
+
+        examples_tensor = examples_tensor.cpu()
+        boards = examples_tensor[:, :board_size].reshape(-1, *board_shape)
+        pis = examples_tensor[:, board_size:-1]
+        vs = examples_tensor[:, -1].tolist()
+        return list(zip(boards, pis, vs))
+
+    def allGatherExamples(self, examples):
+        local = self.packExamples(list(examples)).to(self.device)
+
+        # Exchange shapes so every rank can pad to a common size for all_gather
+        shape = torch.tensor(local.shape, dtype=torch.long, device=self.device)
+        shapes = [torch.zeros_like(shape) for _ in range(self.world_size)]
+        dist.all_gather(shapes, shape)
+        max_rows = max(int(s[0]) for s in shapes)
+        width = max(int(s[1]) for s in shapes)
+
+        padded = torch.zeros((max_rows, width), dtype=torch.float32, device=self.device)
+        padded[:local.shape[0], :local.shape[1]] = local
+        gathered = [torch.empty_like(padded) for _ in range(self.world_size)]
+        dist.all_gather(gathered, padded)
+
+        return self.unpackExamples(torch.cat([g[:int(s[0])] for g, s in zip(gathered, shapes)]))
+
     def getCheckpointFile(self, iteration):
         return 'checkpoint_' + str(iteration) + '.pth.tar'
 
@@ -2,6 +2,7 @@ import unittest
 import torch
 from games.tictactoe import TicTacToeGame
 from networks.tictactoe_resnet import NNetWrapper
+from networks.tictactoe_gat import NNetWrapper as GATNNetWrapper
 from mcts import MCTS
 from utils import dotdict
 
@@ -23,7 +24,7 @@ class TestMCTS(unittest.TestCase):
             'local_rank': 0
         })
         self.nnet = NNetWrapper(self.game, self.args)
-        self.mcts = MCTS(self.game, self.nnet, self.args)
+        self.mcts = MCTS(self.game, self.nnet, self.args, num_envs=self.args.num_parallel_envs)
 
     def test_initialization(self):
         self.assertEqual(self.mcts.num_envs, 2)
@@ -79,5 +80,34 @@ class TestMCTS(unittest.TestCase):
         self.assertEqual(self.mcts.Qsa[0, 0, 0].item(), 0.5)
         self.assertEqual(self.mcts.Qsa[1, 0, 1].item(), -0.5)
 
+class TestMCTSWithGAT(unittest.TestCase):
+    def setUp(self):
+        self.game = TicTacToeGame()
+        self.args = dotdict({
+            'num_parallel_envs': 2,
+            'max_nodes': 1000,
+            'num_mcts_sims': 10,
+            'cpuct': 1.0,
+            'distributed': False,
+            'num_channels': 32,
+            'num_heads': 4,
+            'dropout_rate': 0.3,
+            'lr': 0.001,
+            'l2_regularization': 0.0001,
+            'epochs': 10,
+            'batch_size': 64,
+            'local_rank': 0
+        })
+        self.nnet = GATNNetWrapper(self.game, self.args)
+        self.mcts = MCTS(self.game, self.nnet, self.args, num_envs=self.args.num_parallel_envs)
+
+    def test_search(self):
+        board = self.game.get_init_board()
+        canonical_boards = torch.stack([board] * 2)
+        self.mcts.search(canonical_boards)
+        # The GAT wrapper evaluates both environments' leaves in one batched predict
+        self.assertTrue(torch.all(self.mcts.Ns[:, 0] > 0))
+        self.assertTrue(torch.allclose(self.mcts.Ps[:, 0].sum(dim=1), torch.tensor([1.0, 1.0])))
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
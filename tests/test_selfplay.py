@@ -37,7 +37,9 @@ class TestSelfPlayIntegration(unittest.TestCase):
             'distributed': False,
             'batch_size': 32,
             'epochs': 10,
-            'max_nodes': 1000
+            'max_nodes': 1000,
+            'num_mcts_sims': 5,
+            'num_parallel_envs': 2
         })
 
     def test_selfplay_integration(self):
@@ -56,6 +58,38 @@ class TestSelfPlayIntegration(unittest.TestCase):
         except Exception as e:
             self.fail(f"Self-play failed with error: {str(e)}")
 
+    def test_execute_episodes_parallel(self):
+        game = TicTacToeGame()
+        nnet = NNetWrapper(game, self.args)
+        sp = SelfPlay(game, nnet, self.args)
+
+        episodes = sp.executeEpisodes(self.args.num_parallel_envs)
+        self.assertEqual(len(episodes), self.args.num_parallel_envs)
+        for examples in episodes:
+            self.assertGreater(len(examples), 0)
+
+    def test_pack_unpack_examples_round_trip(self):
+        game = TicTacToeGame()
+        nnet = NNetWrapper(game, self.args)
+        sp = SelfPlay(game, nnet, self.args)
+
+        for board_shape in [(3, 3), (3, 3, 3)]:
+            examples = [
+                (torch.randint(-1, 2, board_shape).float(), torch.rand(game.get_action_size()), v)
+                for v in (1.0, -1.0, 1e-4)
+            ]
+            unpacked = sp.unpackExamples(sp.packExamples(examples))
+
+            self.assertEqual(len(unpacked), len(examples))
+            for (board, pi, v), (new_board, new_pi, new_v) in zip(examples, unpacked):
+                self.assertEqual(new_board.shape, board.shape)
+                self.assertTrue(torch.equal(new_board, board))
+                self.assertTrue(torch.equal(new_pi, pi))
+                self.assertAlmostEqual(new_v, v, places=6)
+
+        # A rank with no examples still round-trips
+        self.assertEqual(sp.unpackExamples(sp.packExamples([])), [])
+
     def test_mcts_search_cpu(self):
         self._run_mcts_search_test(force_cpu=True)
 
@@ -26,6 +26,37 @@ class TestTicTacToeGAT(unittest.TestCase):
         out = layer(x, edge_index)
         self.assertEqual(out.shape, (9, 32 * 4))  # 9 nodes, 32 * 4 features per node
 
+    def test_gatlayer_segment_sum_matches_index_add(self):
+        layer = GATLayer(3, 8, num_heads=2)
+        layer.eval()
+        x = torch.randn(2 * 9, 3)
+        edge_index_single = torch.tensor([[i, j] for i in range(9) for j in range(9) if i != j]).t()
+        edge_index = torch.cat([edge_index_single, edge_index_single + 9], dim=1)
+        # Sort by target and build the CSR row pointer the segment path expects
+        edge_index = edge_index[:, torch.argsort(edge_index[1], stable=True)]
+        in_degree = torch.bincount(edge_index[1], minlength=2 * 9)
+        indptr = torch.cat([in_degree.new_zeros(1), in_degree.cumsum(0)])
+        with torch.no_grad():
+            segment_out = layer(x, edge_index, indptr)
+            index_add_out = layer(x, edge_index)
+        self.assertTrue(torch.allclose(segment_out, index_add_out, atol=1e-5))
+
+    def test_gatlayer_dense_matches_sparse(self):
+        layer = GATLayer(3, 8, num_heads=2)
+        layer.eval()
+        x = torch.randn(2 * 9, 3)  # two 3x3 boards
+        edge_index_single = torch.tensor([[i, j] for i in range(9) for j in range(9) if i != j]).t()
+        edge_index = torch.cat([edge_index_single, edge_index_single + 9], dim=1)
+        with torch.no_grad():
+            sparse_out = layer(x, edge_index)
+            dense_out = layer(x, batch_size=2)
+        self.assertTrue(torch.allclose(sparse_out, dense_out, atol=1e-5))
+
+    def test_gatlayer_dense_requires_batch_size(self):
+        layer = GATLayer(3, 8, num_heads=2)
+        with self.assertRaises(ValueError):
+            layer(torch.randn(9, 3))
+
     def test_tictactoegat_forward(self):
         model = TicTacToeGAT(self.game, self.args)
         x = torch.randn(1, 3, 3, 3)  # (batch_size, channels, height, width)
@@ -33,8 +64,22 @@ class TestTicTacToeGAT(unittest.TestCase):
         self.assertEqual(pi.shape, (1, self.game.get_action_size()))
         self.assertEqual(v.shape, (1, 1))
 
+    def test_tictactoegat_forward_raw_board(self):
+        model = TicTacToeGAT(self.game, self.args)
+        model.eval()
+        raw = torch.randint(-1, 2, (2, 1, 3, 3)).float()  # (batch_size, 1, height, width) with {-1, 0, 1}
+        # Same positions as empty/X/O planes: channel 0 = empty, 1 = X (1), 2 = O (-1)
+        planes = torch.stack([raw[:, 0] == 0, raw[:, 0] == 1, raw[:, 0] == -1], dim=1).float()
+        with torch.no_grad():
+            pi_raw, v_raw = model(raw)
+            pi_planes, v_planes = model(planes)
+        self.assertEqual(pi_raw.shape, (2, self.game.get_action_size()))
+        self.assertEqual(v_raw.shape, (2, 1))
+        self.assertTrue(torch.allclose(pi_raw, pi_planes, atol=1e-6))
+        self.assertTrue(torch.allclose(v_raw, v_planes, atol=1e-6))
+
     def test_nnet_predict(self):
-        board = np.random.randint(0, 3, size=(3, 3, 3))  # (channels, height, width)
+        board = np.random.randint(-1, 2, size=(3, 3))  # raw board with {-1, 0, 1}
         pi, v = self.nnet.predict(board)
         self.assertEqual(pi.shape, (self.game.get_action_size(),))
         self.assertIsInstance(v, float)  # Changed from v[0] to v
@@ -57,7 +102,7 @@ class TestTicTacToeGAT(unittest.TestCase):
         new_nnet.load_checkpoint(folder='test_checkpoint', filename='test_model.pth.tar')
 
         # Compare predictions
-        board = np.random.randint(0, 3, size=(3, 3, 3))
+        board = np.random.randint(-1, 2, size=(3, 3))
         pi1, v1 = self.nnet.predict(board)
         pi2, v2 = new_nnet.predict(board)
         np.testing.assert_array_almost_equal(pi1, pi2, decimal=5)
@@ -78,15 +123,19 @@ class TestTicTacToeGAT(unittest.TestCase):
         self.assertTrue(np.array_equal(augmented[0][1], pi))
         self.assertEqual(augmented[0][2], v)
         
-        # Check rotations
+        # Check rotations over the spatial axes, not the channel axis (the pass probability stays last)
         for i in range(1, 4):
-            self.assertTrue(np.array_equal(augmented[i][0], np.rot90(board, i)))
-            self.assertTrue(np.array_equal(augmented[i][1], np.rot90(pi.reshape(3, 3), i).flatten()))
+            self.assertTrue(np.array_equal(augmented[i][0], np.rot90(board, i, axes=(-2, -1))))
+            for c in range(3):
+                self.assertTrue(np.array_equal(augmented[i][0][c], np.rot90(board[c], i)))
+            self.assertTrue(np.array_equal(augmented[i][1][:9], np.rot90(pi[:9].reshape(3, 3), i).flatten()))
+            self.assertEqual(augmented[i][1][9], pi[9])
             self.assertEqual(augmented[i][2], v)
         
         # Check flip
-        self.assertTrue(np.array_equal(augmented[4][0], np.fliplr(board)))
-        self.assertTrue(np.array_equal(augmented[4][1], np.fliplr(pi.reshape(3, 3)).flatten()))
+        self.assertTrue(np.array_equal(augmented[4][0], np.flip(board, axis=-1)))
+        self.assertTrue(np.array_equal(augmented[4][1][:9], np.fliplr(pi[:9].reshape(3, 3)).flatten()))
+        self.assertEqual(augmented[4][1][9], pi[9])
         self.assertEqual(augmented[4][2], v)
         
         # Check shapes and sizes
@@ -95,8 +144,25 @@ class TestTicTacToeGAT(unittest.TestCase):
             self.assertEqual(aug_pi.shape, (self.game.get_action_size(),))
             self.assertIsInstance(aug_v, float)
 
+    def test_nnet_predict_planes(self):
+        board = np.random.randint(0, 2, size=(1, 3, 3, 3))  # (batch_size, channels, height, width)
+        pi, v = self.nnet.predict(board)
+        self.assertEqual(pi.shape, (1, self.game.get_action_size()))
+        self.assertEqual(v.shape, (1,))
+
+    def test_nnet_predict_batch(self):
+        boards = np.random.randint(-1, 2, size=(3, 3, 3))  # three raw boards
+        pi, v = self.nnet.predict(boards)
+        self.assertEqual(pi.shape, (3, self.game.get_action_size()))
+        self.assertEqual(v.shape, (3,))
+        # Each row matches predicting that board on its own
+        for i in range(3):
+            pi_i, v_i = self.nnet.predict(boards[i])
+            np.testing.assert_array_almost_equal(pi[i], pi_i, decimal=5)
+            self.assertAlmostEqual(float(v[i]), v_i, places=5)
+
     def test_untrained_nnet_predict(self):
-        board = np.zeros((3, 3, 3))  # Empty board
+        board = np.zeros((3, 3))  # Empty raw board
         
         pi, v = self.nnet.predict(board)
         
@@ -17,4 +17,8 @@ class AverageMeter(object):
 
 class dotdict(dict):
     def __getattr__(self, name):
-        return self[name]
\ No newline at end of file
+        # Raise AttributeError so getattr(args, name, default) and hasattr work
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
\ No newline at end of file